@@ -5,19 +5,48 @@ This script verifies the complete data flow from databases to analysis
 """
 
 import argparse
+import asyncio
+import functools
 import json
 import os
+import random
+import re
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 
-import pandas as pd
-import requests
-import mysql.connector
-import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-from tabulate import tabulate
+# The database drivers, requests, and aiohttp are imported lazily inside
+# the methods that use them so that --help and argument errors do not pay
+# for loading their C extensions and SSL stack
+
+
+# SQL templates for the Druid ingestion checks; only the probe-window
+# timestamps (and the db.system / sample filter) vary between runs
+_DRUID_COUNT_SQL = (
+    "SELECT COUNT(*) AS count FROM qan_db "
+    "WHERE \"__time\" BETWEEN TIMESTAMP '{s}' AND TIMESTAMP '{e}' "
+    "AND db.system = '{system}'"
+)
+_DRUID_GROUPED_COUNT_SQL = (
+    "SELECT db.system AS system, COUNT(*) AS total, "
+    "SUM(CASE WHEN db.statement.sample LIKE '%orders%' "
+    "OR db.statement.sample LIKE '%products%' THEN 1 ELSE 0 END) AS test_count "
+    "FROM qan_db "
+    "WHERE \"__time\" BETWEEN TIMESTAMP '{s}' AND TIMESTAMP '{e}' "
+    "GROUP BY db.system"
+)
+
+
+_COMPOSE_VAR_RE = re.compile(r"\$\{(\w+)(?::-([^}]*))?\}")
+
+
+def _interpolate_compose_vars(value):
+    """Expand ${VAR} / ${VAR:-default} references in a compose string"""
+    return _COMPOSE_VAR_RE.sub(
+        lambda m: os.environ.get(m.group(1), m.group(2) or ""), value
+    )
 
 
 class Colors:
@@ -30,19 +59,36 @@ class Colors:
     BOLD = '\033[1m'
 
 
+_LEVEL_COLORS = {
+    "INFO": Colors.BLUE,
+    "SUCCESS": Colors.GREEN,
+    "WARNING": Colors.YELLOW,
+    "ERROR": Colors.RED,
+}
+
+
 def log(level, message):
     """Log messages with color coding by level"""
-    color = Colors.ENDC
-    if level == "INFO":
-        color = Colors.BLUE
-    elif level == "SUCCESS":
-        color = Colors.GREEN
-    elif level == "WARNING":
-        color = Colors.YELLOW
-    elif level == "ERROR":
-        color = Colors.RED
-
-    print(f"{color}[{level}] {message}{Colors.ENDC}")
+    print(f"{_LEVEL_COLORS.get(level, Colors.ENDC)}[{level}] {message}{Colors.ENDC}")
+
+
+def retry_backoff(max_tries=6, base=1.0, factor=2.0, cap=30.0, exceptions=(Exception,)):
+    """Retry a callable with exponential backoff and jitter on transient failures"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(1, max_tries + 1):
+                try:
+                    return func(*args, **kwargs)
+                except exceptions as e:
+                    if attempt == max_tries:
+                        raise
+                    delay = min(cap, base * factor ** (attempt - 1)) + random.uniform(0, 0.25)
+                    log("WARNING", f"{func.__name__} failed (attempt {attempt}/{max_tries}), "
+                                   f"retrying in {delay:.1f}s: {e}")
+                    time.sleep(delay)
+        return wrapper
+    return decorator
 
 
 class ObsidianE2ETest:
@@ -69,7 +115,28 @@ class ObsidianE2ETest:
         self.use_existing_stack = args.use_existing
         self.docker_compose_file = args.docker_compose_file
         self.skip_wait = args.skip_wait
-        
+        self.parallel_dbgen = args.parallel_dbgen
+
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        # Shared HTTP session so repeated probes reuse pooled keep-alive
+        # connections instead of paying a TCP handshake per call
+        self.http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+        )
+        self.http.mount("http://", adapter)
+
+        # Database connections are opened lazily and shared between the
+        # probe and data-load phases to avoid repeated auth handshakes
+        self._mysql_conn = None
+        self._pg_conn = None
+
+
         # Test results
         self.test_results = {
             "mysql_connection": False,
@@ -86,47 +153,89 @@ class ObsidianE2ETest:
         """Execute the full end-to-end test"""
         log("INFO", "Starting Project Obsidian Core end-to-end test")
 
-        if not self.use_existing_stack:
-            self._start_stack()
-        else:
-            log("INFO", "Using existing stack (skipping startup)")
+        try:
+            if not self.use_existing_stack:
+                self._start_stack()
+            else:
+                log("INFO", "Using existing stack (skipping startup)")
+
+            # Run the independent connection probes concurrently; each probe
+            # writes its own key in self.test_results so there is no shared state
+            probes = [
+                self._test_mysql_connection,
+                self._test_postgresql_connection,
+                self._test_druid_connection,
+                self._test_jupyter_connection,
+            ]
+            with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+                futures = [executor.submit(probe) for probe in probes]
+                for future in as_completed(futures):
+                    future.result()
+
+            # Generate test data if connections are good; the generators
+            # target different servers, so they can overlap their I/O wait
+            dbgen_tasks = []
+            if self.test_results["mysql_connection"]:
+                dbgen_tasks.append(self._generate_mysql_test_data)
+
+            if self.test_results["postgresql_connection"]:
+                dbgen_tasks.append(self._generate_postgresql_test_data)
+
+            if self.parallel_dbgen and len(dbgen_tasks) > 1:
+                with ThreadPoolExecutor(max_workers=len(dbgen_tasks)) as executor:
+                    futures = [executor.submit(task) for task in dbgen_tasks]
+                    for future in as_completed(futures):
+                        future.result()
+            else:
+                for task in dbgen_tasks:
+                    task()
+
+            # Wait for data to be processed and ingested
+            if not self.skip_wait:
+                log("INFO", "Waiting for data to be processed by OTel and ingested into Druid")
+                if self._wait_until(self._druid_has_qan_data, timeout=120):
+                    log("SUCCESS", "QAN data is available in Druid")
+                else:
+                    log("WARNING", "Timed out waiting for QAN data to appear in Druid")
+            else:
+                log("INFO", "Skipping wait period (--skip-wait flag used)")
 
-        # Test database connections and setup test data
-        self._test_mysql_connection()
-        self._test_postgresql_connection()
-        
-        # Generate test data if connections are good
-        if self.test_results["mysql_connection"]:
-            self._generate_mysql_test_data()
-        
-        if self.test_results["postgresql_connection"]:
-            self._generate_postgresql_test_data()
+            # Check data in Druid
+            self._check_druid_ingestion()
+        finally:
+            self._close_db_connections()
+            self.http.close()
 
-        # Test Druid connection
-        self._test_druid_connection()
-        
-        # Wait for data to be processed and ingested
-        if not self.skip_wait:
-            log("INFO", "Waiting for data to be processed by OTel and ingested into Druid (60s)")
-            time.sleep(60)
-        else:
-            log("INFO", "Skipping wait period (--skip-wait flag used)")
-        
-        # Check data in Druid
-        self._check_druid_ingestion()
-        
-        # Check Jupyter connection
-        self._test_jupyter_connection()
-        
         # Print summary
         self._print_summary()
-        
+
         return all(self.test_results.values())
 
     def _start_stack(self):
-        """Start the Obsidian Core stack using docker-compose"""
+        """Start the Obsidian Core stack, preferring the Docker SDK"""
         log("INFO", f"Starting Obsidian Core stack using {self.docker_compose_file}")
-        
+
+        try:
+            import docker
+            import yaml
+        except ImportError:
+            log("INFO", "Docker SDK or PyYAML not available, falling back to docker-compose")
+            self._start_stack_compose()
+        else:
+            try:
+                self._start_stack_docker_sdk(docker, yaml)
+                log("SUCCESS", "Stack started successfully")
+            except Exception as e:
+                log("WARNING", f"Docker SDK startup failed ({e}), falling back to docker-compose")
+                self._start_stack_compose()
+
+        # Wait for services to be ready
+        log("INFO", "Waiting for services to become ready")
+        if not self._wait_until(self._druid_is_available, timeout=120):
+            log("WARNING", "Services did not become ready in time, continuing anyway")
+
+    def _start_stack_compose(self):
+        """Start the stack by shelling out to docker-compose"""
         try:
             subprocess.run(
                 ["docker-compose", "-f", self.docker_compose_file, "up", "-d"],
@@ -136,51 +245,299 @@ class ObsidianE2ETest:
                 universal_newlines=True
             )
             log("SUCCESS", "Stack started successfully")
-            
-            # Wait for services to be ready
-            log("INFO", "Waiting for services to start (30s initial wait)")
-            time.sleep(30)
         except subprocess.CalledProcessError as e:
             log("ERROR", f"Failed to start stack: {e.stderr}")
             sys.exit(1)
 
-    def _test_mysql_connection(self):
-        """Test MySQL connection"""
-        log("INFO", f"Testing MySQL connection to {self.mysql_host}:{self.mysql_port}")
-        
+    def _start_stack_docker_sdk(self, docker, yaml):
+        """Start the compose services through the Docker SDK.
+
+        Services are brought up in depends_on order, one dependency level
+        at a time, with a bounded worker pool so low-resource runners are
+        not starved by an unbounded parallel startup.
+        """
+        with open(self.docker_compose_file) as f:
+            spec = yaml.safe_load(f)
+
+        services = spec.get("services", {})
+        compose_dir = os.path.dirname(os.path.abspath(self.docker_compose_file))
+        client = docker.from_env()
+
+        # The SDK path cannot build images, so bail out to docker-compose
+        # before creating anything if any declared image is missing;
+        # failing halfway through would leave named containers behind that
+        # compose refuses to adopt
+        for name, service in services.items():
+            try:
+                client.images.get(service["image"])
+            except docker.errors.ImageNotFound:
+                raise RuntimeError(
+                    f"image {service['image']} for service {name} is not built yet"
+                )
+
+        # Ensure the declared networks and named volumes exist
+        existing_networks = {n.name for n in client.networks.list()}
+        for name in spec.get("networks", {}):
+            if name not in existing_networks:
+                client.networks.create(name, driver="bridge")
+        existing_volumes = {v.name for v in client.volumes.list()}
+        for name in spec.get("volumes", {}):
+            if name not in existing_volumes:
+                client.volumes.create(name)
+
+        # Group services into dependency levels so each level only starts
+        # once everything it depends_on is up
+        levels = {}
+
+        def level_of(name, seen=()):
+            if name in levels:
+                return levels[name]
+            if name in seen:
+                raise ValueError(f"depends_on cycle involving {name}")
+            deps = services[name].get("depends_on", [])
+            levels[name] = 1 + max(
+                (level_of(dep, seen + (name,)) for dep in deps), default=-1
+            )
+            return levels[name]
+
+        for name in services:
+            level_of(name)
+
+        max_workers = min(4, os.cpu_count() or 1)
+        for level in sorted(set(levels.values())):
+            batch = [name for name, lvl in levels.items() if lvl == level]
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(self._start_service, client, name, services[name], compose_dir)
+                    for name in batch
+                ]
+                for future in as_completed(futures):
+                    future.result()
+
+    def _start_service(self, client, name, service, compose_dir):
+        """Start a single compose service as a detached container"""
+        import docker
+
+        container_name = service.get("container_name", name)
+
+        # Reuse an existing container rather than recreating it
+        try:
+            container = client.containers.get(container_name)
+            if container.status != "running":
+                container.start()
+            return
+        except docker.errors.NotFound:
+            pass
+
+        ports = {}
+        for mapping in service.get("ports", []):
+            parts = str(mapping).split(":")
+            if len(parts) == 3:  # "ip:host:container"
+                host_ip, host_port, container_port = parts
+                ports[f"{container_port}/tcp"] = (host_ip, int(host_port))
+            elif len(parts) == 2:  # "host:container"
+                host_port, container_port = parts
+                ports[f"{container_port}/tcp"] = int(host_port)
+            else:  # bare container port, let Docker pick the host side
+                ports[f"{parts[0]}/tcp"] = None
+
+        volumes = {}
+        for mapping in service.get("volumes", []):
+            parts = mapping.split(":")
+            source, target = parts[0], parts[1]
+            mode = parts[2] if len(parts) > 2 else "rw"
+            if source.startswith("."):
+                source = os.path.normpath(os.path.join(compose_dir, source))
+            volumes[source] = {"bind": target, "mode": mode}
+
+        environment = [
+            _interpolate_compose_vars(entry) for entry in service.get("environment", [])
+        ]
+
+        client.containers.run(
+            service["image"],
+            command=service.get("command"),
+            name=container_name,
+            detach=True,
+            environment=environment,
+            ports=ports,
+            volumes=volumes,
+            network=next(iter(service.get("networks", [])), None),
+            restart_policy={"Name": service.get("restart", "no")},
+        )
+
+    def _wait_until(self, predicate, timeout, initial=1.0, factor=1.5, cap=8.0):
+        """Poll a predicate with exponential backoff until it returns True or the timeout expires"""
+        deadline = time.monotonic() + timeout
+        delay = initial
+        while time.monotonic() < deadline:
+            if predicate():
+                return True
+            time.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+            delay = min(delay * factor, cap)
+        return False
+
+    def _druid_is_available(self):
+        """Check whether the Druid router answers its status endpoint"""
+        import requests
+
         try:
+            response = self.http.head(f"{self.druid_url}/status", timeout=5)
+            if response.status_code == 405:
+                response = self.http.get(f"{self.druid_url}/status", timeout=5)
+            return response.status_code == 200
+        except requests.RequestException:
+            return False
+
+    def _druid_has_qan_data(self):
+        """Check whether Druid already holds QAN records for either database"""
+        import requests
+
+        # Use UTC to match Druid's __time semantics; isoformat is the C
+        # fast path and produces the same 'YYYY-MM-DD HH:MM:SS' shape
+        end_time = datetime.utcnow()
+        start_time = end_time - timedelta(hours=1)
+        start_time_str = start_time.isoformat(sep=' ', timespec='seconds')
+        end_time_str = end_time.isoformat(sep=' ', timespec='seconds')
+
+        for system in ("mysql", "postgresql"):
+            query = _DRUID_COUNT_SQL.format(s=start_time_str, e=end_time_str, system=system)
+            try:
+                response = self.http.post(
+                    f"{self.druid_url}/druid/v2/sql",
+                    headers={"Content-Type": "application/json"},
+                    json={"query": query, "context": {"sqlQueryId": f"wait-{system}-count"}},
+                    timeout=5
+                )
+                if response.status_code == 200:
+                    rows = response.json()
+                    if rows and rows[0]['count'] > 0:
+                        return True
+            except (requests.RequestException, ValueError):
+                # Connection trouble or an unparseable body just means the
+                # data is not there yet; let _wait_until keep polling
+                return False
+        return False
+
+    def _connect_mysql(self):
+        """Open a MySQL connection, retrying transient failures with backoff"""
+        import mysql.connector
+
+        @retry_backoff(exceptions=(mysql.connector.Error,))
+        def connect():
             conn = mysql.connector.connect(
                 host=self.mysql_host,
                 port=self.mysql_port,
                 user=self.mysql_user,
-                password=self.mysql_password
+                password=self.mysql_password,
+                connection_timeout=5
             )
-            
+            # Bound every statement so an unresponsive server fails fast
+            # instead of hanging the whole test
+            cursor = conn.cursor()
+            cursor.execute("SET SESSION MAX_EXECUTION_TIME=5000")
+            cursor.close()
+            return conn
+
+        return connect()
+
+    def _connect_postgresql(self):
+        """Open a PostgreSQL connection, retrying transient failures with backoff"""
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        @retry_backoff(exceptions=(psycopg2.OperationalError,))
+        def connect():
+            conn = psycopg2.connect(
+                host=self.pg_host,
+                port=self.pg_port,
+                user=self.pg_user,
+                password=self.pg_password,
+                database=self.pg_database,
+                connect_timeout=5
+            )
+            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            # Bound statement and lock waits so an unresponsive server fails
+            # fast instead of hanging the whole test
             cursor = conn.cursor()
-            cursor.execute("SELECT VERSION()")
-            version = cursor.fetchone()[0]
+            cursor.execute("SET statement_timeout = '5s'; SET lock_timeout = '2s'")
+            cursor.close()
+            return conn
+
+        return connect()
+
+    def _get_mysql_conn(self):
+        """Return the shared MySQL connection, opening it on first use"""
+        if self._mysql_conn is None:
+            self._mysql_conn = self._connect_mysql()
+        return self._mysql_conn
+
+    def _get_pg_conn(self):
+        """Return the shared PostgreSQL connection, opening it on first use"""
+        if self._pg_conn is None:
+            self._pg_conn = self._connect_postgresql()
+        return self._pg_conn
+
+    def _close_db_connections(self):
+        """Close the shared database connections if they were opened"""
+        for conn in (self._mysql_conn, self._pg_conn):
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+        self._mysql_conn = None
+        self._pg_conn = None
+
+    def _http_probe(self, url):
+        """Liveness-probe a URL with HEAD, falling back to GET on 405.
+
+        Only the status code matters for liveness, so HEAD avoids
+        transferring the response body; some servers reject HEAD with
+        405, in which case we retry the probe as a GET.
+        """
+        import requests
+
+        @retry_backoff(exceptions=(requests.RequestException,))
+        def probe():
+            response = self.http.head(url, allow_redirects=True, timeout=5)
+            if response.status_code == 405:
+                response = self.http.get(url, timeout=5)
+            return response
+
+        return probe()
+
+    def _test_mysql_connection(self):
+        """Test MySQL connection"""
+        log("INFO", f"Testing MySQL connection to {self.mysql_host}:{self.mysql_port}")
+
+        try:
+            conn = self._get_mysql_conn()
+
+            cursor = conn.cursor()
+            # Fetch version, performance_schema flag, and the
+            # statements_digest consumer state in a single round trip
+            cursor.execute(
+                "SELECT VERSION(), @@performance_schema, "
+                "(SELECT enabled FROM performance_schema.setup_consumers "
+                "WHERE name = 'statements_digest')"
+            )
+            version, perf_schema, digest_enabled = cursor.fetchone()
             log("SUCCESS", f"Connected to MySQL version: {version}")
-            
+
             # Check if performance_schema is enabled
-            cursor.execute("SHOW VARIABLES LIKE 'performance_schema'")
-            perf_schema = cursor.fetchone()
-            if perf_schema and perf_schema[1] == "ON":
+            if perf_schema == 1:
                 log("SUCCESS", "Performance Schema is enabled")
             else:
                 log("ERROR", "Performance Schema is not enabled!")
-                
+
             # Check if statements_digest is enabled
-            cursor.execute(
-                "SELECT enabled FROM performance_schema.setup_consumers WHERE name = 'statements_digest'"
-            )
-            digest_enabled = cursor.fetchone()
-            if digest_enabled and digest_enabled[0] == "YES":
+            if digest_enabled == "YES":
                 log("SUCCESS", "Statements digest consumer is enabled")
             else:
                 log("ERROR", "Statements digest consumer is not enabled!")
             
             cursor.close()
-            conn.close()
             self.test_results["mysql_connection"] = True
         except Exception as e:
             log("ERROR", f"Failed to connect to MySQL: {e}")
@@ -191,40 +548,36 @@ class ObsidianE2ETest:
         log("INFO", f"Testing PostgreSQL connection to {self.pg_host}:{self.pg_port}")
         
         try:
-            conn = psycopg2.connect(
-                host=self.pg_host,
-                port=self.pg_port,
-                user=self.pg_user,
-                password=self.pg_password,
-                database=self.pg_database
-            )
-            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-            
+            conn = self._get_pg_conn()
+
             cursor = conn.cursor()
-            cursor.execute("SELECT version()")
-            version = cursor.fetchone()[0]
-            log("SUCCESS", f"Connected to PostgreSQL version: {version}")
-            
-            # Check if pg_stat_statements is installed
+            # Fetch the version and the extension check in one round trip;
+            # probing the view itself has to wait until we know the
+            # extension exists, or the whole statement errors and hides
+            # the diagnostics on a healthy server without it
             cursor.execute(
-                "SELECT EXISTS(SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements')"
+                "SELECT version(), "
+                "EXISTS(SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements')"
             )
-            has_extension = cursor.fetchone()[0]
+            version, has_extension = cursor.fetchone()
+            log("SUCCESS", f"Connected to PostgreSQL version: {version}")
+
+            # Check if pg_stat_statements is installed
             if has_extension:
                 log("SUCCESS", "pg_stat_statements extension is installed")
             else:
                 log("ERROR", "pg_stat_statements extension is not installed!")
-                
+
             # Check if we can query pg_stat_statements
-            cursor.execute("SELECT EXISTS(SELECT 1 FROM pg_stat_statements LIMIT 1)")
-            can_query = cursor.fetchone()[0]
-            if can_query:
-                log("SUCCESS", "Successfully queried pg_stat_statements")
-            else:
-                log("ERROR", "Cannot query pg_stat_statements!")
-            
+            if has_extension:
+                cursor.execute("SELECT EXISTS(SELECT 1 FROM pg_stat_statements LIMIT 1)")
+                can_query = cursor.fetchone()[0]
+                if can_query:
+                    log("SUCCESS", "Successfully queried pg_stat_statements")
+                else:
+                    log("ERROR", "Cannot query pg_stat_statements!")
+
             cursor.close()
-            conn.close()
             self.test_results["postgresql_connection"] = True
         except Exception as e:
             log("ERROR", f"Failed to connect to PostgreSQL: {e}")
@@ -235,14 +588,9 @@ class ObsidianE2ETest:
         log("INFO", "Generating test data in MySQL")
         
         try:
-            conn = mysql.connector.connect(
-                host=self.mysql_host,
-                port=self.mysql_port,
-                user=self.mysql_user,
-                password=self.mysql_password
-            )
+            conn = self._get_mysql_conn()
             cursor = conn.cursor()
-            
+
             # Create test database
             cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.mysql_database}")
             cursor.execute(f"USE {self.mysql_database}")
@@ -258,34 +606,38 @@ class ObsidianE2ETest:
                 )
             """)
             
-            # Insert test data
-            cursor.execute("""
-                INSERT INTO orders (customer_id, order_date, amount, status)
-                VALUES 
-                  (101, NOW(), 199.99, 'completed'),
-                  (102, NOW(), 99.50, 'pending'),
-                  (103, NOW(), 50.25, 'completed'),
-                  (104, NOW(), 25.99, 'cancelled'),
-                  (105, NOW(), 39.99, 'pending')
-            """)
+            # Insert test data as parameterized rows so the statement is
+            # parsed once regardless of row count
+            order_rows = [
+                (101, 199.99, 'completed'),
+                (102, 99.50, 'pending'),
+                (103, 50.25, 'completed'),
+                (104, 25.99, 'cancelled'),
+                (105, 39.99, 'pending'),
+            ]
+            cursor.executemany(
+                "INSERT INTO orders (customer_id, order_date, amount, status) "
+                "VALUES (%s, NOW(), %s, %s)",
+                order_rows
+            )
             
             # Run test queries
             test_queries = [
                 "SELECT * FROM orders WHERE amount > 50",
                 "SELECT status, COUNT(*) AS count, SUM(amount) AS total FROM orders GROUP BY status",
                 "SELECT customer_id, COUNT(*) FROM orders GROUP BY customer_id HAVING COUNT(*) > 0",
-                "SELECT AVG(amount) AS average_order FROM orders",
-                "SELECT AVG(amount) AS average_order FROM orders",
                 "SELECT AVG(amount) AS average_order FROM orders"
             ]
-            
-            for query in test_queries:
-                cursor.execute(query)
-                cursor.fetchall()  # Consume the result set
+
+            # Ship the whole batch in one round trip and drain each result
+            # set as it streams back
+            for result in cursor.execute("; ".join(test_queries), multi=True):
+                if result.with_rows:
+                    for _ in result:
+                        pass
             
             conn.commit()
             cursor.close()
-            conn.close()
             
             log("SUCCESS", "Generated test data in MySQL")
             self.test_results["mysql_test_data"] = True
@@ -297,17 +649,12 @@ class ObsidianE2ETest:
         """Generate test data in PostgreSQL"""
         log("INFO", "Generating test data in PostgreSQL")
         
+        from psycopg2.extras import execute_values
+
         try:
-            conn = psycopg2.connect(
-                host=self.pg_host,
-                port=self.pg_port,
-                user=self.pg_user,
-                password=self.pg_password,
-                database=self.pg_database
-            )
-            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            conn = self._get_pg_conn()
             cursor = conn.cursor()
-            
+
             # Create test table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS products (
@@ -319,31 +666,36 @@ class ObsidianE2ETest:
                 )
             """)
             
-            # Insert test data
-            cursor.execute("""
-                INSERT INTO products (name, category, price, inventory)
-                VALUES 
-                  ('Laptop', 'Electronics', 999.99, 25),
-                  ('Smartphone', 'Electronics', 699.50, 50),
-                  ('Headphones', 'Accessories', 89.99, 100),
-                  ('Monitor', 'Electronics', 249.99, 15),
-                  ('Keyboard', 'Accessories', 59.99, 30)
-                ON CONFLICT (id) DO NOTHING
-            """)
+            # Insert test data as parameterized rows; execute_values sends
+            # one statement with a server-built VALUES list
+            product_rows = [
+                ('Laptop', 'Electronics', 999.99, 25),
+                ('Smartphone', 'Electronics', 699.50, 50),
+                ('Headphones', 'Accessories', 89.99, 100),
+                ('Monitor', 'Electronics', 249.99, 15),
+                ('Keyboard', 'Accessories', 59.99, 30),
+            ]
+            execute_values(
+                cursor,
+                "INSERT INTO products (name, category, price, inventory) VALUES %s "
+                "ON CONFLICT (id) DO NOTHING",
+                product_rows,
+                page_size=1000
+            )
             
             # Run test queries
             test_queries = [
                 "SELECT * FROM products WHERE price > 100",
                 "SELECT category, COUNT(*) AS count, SUM(price) AS total_price FROM products GROUP BY category",
                 "SELECT * FROM products ORDER BY price DESC",
-                "SELECT AVG(price) AS average_price FROM products",
-                "SELECT AVG(price) AS average_price FROM products",
                 "SELECT AVG(price) AS average_price FROM products"
             ]
-            
-            for query in test_queries:
-                cursor.execute(query)
-                cursor.fetchall()  # Consume the result set
+
+            # Ship the whole batch in one round trip; psycopg2 executes the
+            # multi-statement string server side and returns the last result
+            cursor.execute("; ".join(test_queries))
+            for _ in cursor:  # Drain without materializing the rows
+                pass
             
             # Check for test queries in pg_stat_statements
             cursor.execute("""
@@ -361,7 +713,6 @@ class ObsidianE2ETest:
                 log("WARNING", "No product queries found in pg_stat_statements yet")
             
             cursor.close()
-            conn.close()
             
             log("SUCCESS", "Generated test data in PostgreSQL")
             self.test_results["postgresql_test_data"] = True
@@ -374,7 +725,7 @@ class ObsidianE2ETest:
         log("INFO", f"Testing Druid connection to {self.druid_url}")
         
         try:
-            response = requests.get(f"{self.druid_url}/status")
+            response = self._http_probe(f"{self.druid_url}/status")
             if response.status_code == 200:
                 log("SUCCESS", "Druid is available")
                 self.test_results["druid_connection"] = True
@@ -395,143 +746,101 @@ class ObsidianE2ETest:
             return
         
         try:
-            # Check for qan_db table
-            tables_response = requests.post(
-                f"{self.druid_url}/druid/v2/sql",
-                headers={"Content-Type": "application/json"},
-                json={"query": "SHOW TABLES", "context": {"sqlQueryId": "test-tables"}}
-            )
-            
-            if tables_response.status_code != 200:
-                log("ERROR", f"Failed to query Druid tables: {tables_response.text}")
-                self.test_results["druid_ingestion"] = False
-                return
-            
-            tables = tables_response.json()
-            table_found = False
-            for table in tables:
-                if 'TABLE_NAME' in table and table['TABLE_NAME'] == 'qan_db':
-                    table_found = True
-                    break
-            
-            if not table_found:
-                log("ERROR", "qan_db table not found in Druid")
-                self.test_results["druid_ingestion"] = False
-                return
-            
-            log("SUCCESS", "qan_db table found in Druid")
-            
-            # Define time range for queries
-            end_time = datetime.now()
-            start_time = end_time - timedelta(hours=1)
-            start_time_str = start_time.strftime("%Y-%m-%d %H:%M:%S")
-            end_time_str = end_time.strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Check for MySQL data
-            mysql_query = f"""
-                SELECT COUNT(*) AS count
-                FROM qan_db
-                WHERE "__time" BETWEEN TIMESTAMP '{start_time_str}' AND TIMESTAMP '{end_time_str}'
-                AND db.system = 'mysql'
-            """
-            
-            mysql_response = requests.post(
-                f"{self.druid_url}/druid/v2/sql",
-                headers={"Content-Type": "application/json"},
-                json={"query": mysql_query, "context": {"sqlQueryId": "test-mysql-count"}}
-            )
-            
-            if mysql_response.status_code != 200:
-                log("ERROR", f"Failed to query MySQL data count: {mysql_response.text}")
-            else:
-                mysql_count = mysql_response.json()[0]['count']
-                log("INFO", f"Found {mysql_count} MySQL QAN records in Druid")
-                
-                if mysql_count > 0:
-                    self.test_results["otel_collection"] = True
-                
-                # Check for test data specifically
-                mysql_test_query = f"""
-                    SELECT COUNT(*) AS count
-                    FROM qan_db
-                    WHERE "__time" BETWEEN TIMESTAMP '{start_time_str}' AND TIMESTAMP '{end_time_str}'
-                    AND db.system = 'mysql'
-                    AND db.statement.sample LIKE '%orders%'
-                """
-                
-                mysql_test_response = requests.post(
-                    f"{self.druid_url}/druid/v2/sql",
-                    headers={"Content-Type": "application/json"},
-                    json={"query": mysql_test_query, "context": {"sqlQueryId": "test-mysql-test-count"}}
-                )
-                
-                if mysql_test_response.status_code == 200:
-                    mysql_test_count = mysql_test_response.json()[0]['count']
-                    log("INFO", f"Found {mysql_test_count} MySQL test query records in Druid")
-            
-            # Check for PostgreSQL data
-            pg_query = f"""
-                SELECT COUNT(*) AS count
-                FROM qan_db
-                WHERE "__time" BETWEEN TIMESTAMP '{start_time_str}' AND TIMESTAMP '{end_time_str}'
-                AND db.system = 'postgresql'
-            """
-            
-            pg_response = requests.post(
-                f"{self.druid_url}/druid/v2/sql",
-                headers={"Content-Type": "application/json"},
-                json={"query": pg_query, "context": {"sqlQueryId": "test-pg-count"}}
-            )
-            
-            if pg_response.status_code != 200:
-                log("ERROR", f"Failed to query PostgreSQL data count: {pg_response.text}")
-            else:
-                pg_count = pg_response.json()[0]['count']
-                log("INFO", f"Found {pg_count} PostgreSQL QAN records in Druid")
-                
-                if pg_count > 0:
-                    self.test_results["otel_collection"] = True
-                
-                # Check for test data specifically
-                pg_test_query = f"""
-                    SELECT COUNT(*) AS count
-                    FROM qan_db
-                    WHERE "__time" BETWEEN TIMESTAMP '{start_time_str}' AND TIMESTAMP '{end_time_str}'
-                    AND db.system = 'postgresql'
-                    AND db.statement.sample LIKE '%products%'
-                """
-                
-                pg_test_response = requests.post(
-                    f"{self.druid_url}/druid/v2/sql",
-                    headers={"Content-Type": "application/json"},
-                    json={"query": pg_test_query, "context": {"sqlQueryId": "test-pg-test-count"}}
-                )
-                
-                if pg_test_response.status_code == 200:
-                    pg_test_count = pg_test_response.json()[0]['count']
-                    log("INFO", f"Found {pg_test_count} PostgreSQL test query records in Druid")
-            
-            # Mark ingestion as successful if we found any data
-            mysql_data_found = mysql_response.status_code == 200 and mysql_response.json()[0]['count'] > 0
-            pg_data_found = pg_response.status_code == 200 and pg_response.json()[0]['count'] > 0
-            
-            if mysql_data_found or pg_data_found:
-                log("SUCCESS", "Found QAN data in Druid")
-                self.test_results["druid_ingestion"] = True
-            else:
-                log("ERROR", "No QAN data found in Druid")
-                self.test_results["druid_ingestion"] = False
-                
+            asyncio.run(self._check_druid_ingestion_async())
         except Exception as e:
             log("ERROR", f"Error checking Druid ingestion: {e}")
             self.test_results["druid_ingestion"] = False
 
+    async def _post_druid_sql(self, session, query, query_id):
+        """POST one SQL query to Druid and return (status, parsed body)"""
+        async with session.post(
+            f"{self.druid_url}/druid/v2/sql",
+            headers={"Content-Type": "application/json"},
+            json={"query": query, "context": {"sqlQueryId": query_id}}
+        ) as response:
+            if response.status != 200:
+                return response.status, await response.text()
+            return response.status, await response.json(content_type=None)
+
+    async def _check_druid_ingestion_async(self):
+        """Issue all Druid SQL checks concurrently and evaluate the results"""
+        import aiohttp
+
+        # Define time range for queries
+        # Use UTC to match Druid's __time semantics; isoformat is the C
+        # fast path and produces the same 'YYYY-MM-DD HH:MM:SS' shape
+        end_time = datetime.utcnow()
+        start_time = end_time - timedelta(hours=1)
+        start_time_str = start_time.isoformat(sep=' ', timespec='seconds')
+        end_time_str = end_time.isoformat(sep=' ', timespec='seconds')
+
+        window = {"s": start_time_str, "e": end_time_str}
+        queries = [
+            ("tables", "SELECT 1 FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_NAME = 'qan_db' LIMIT 1"),
+            ("counts", _DRUID_GROUPED_COUNT_SQL.format(**window)),
+        ]
+
+        # Fire both queries in one gather over a keep-alive session; the
+        # grouped query replaces the four separate per-system counts with
+        # a single broker scan
+        connector = aiohttp.TCPConnector(limit=8)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            responses = await asyncio.gather(*[
+                self._post_druid_sql(session, query, f"test-{name}")
+                for name, query in queries
+            ])
+        results = {name: response for (name, _), response in zip(queries, responses)}
+
+        # Check for qan_db table; the filter runs on the broker, so the
+        # response is either empty or a single marker row
+        tables_status, tables = results["tables"]
+        if tables_status != 200:
+            log("ERROR", f"Failed to query Druid tables: {tables}")
+            self.test_results["druid_ingestion"] = False
+            return
+
+        if not tables:
+            log("ERROR", "qan_db table not found in Druid")
+            self.test_results["druid_ingestion"] = False
+            return
+
+        log("SUCCESS", "qan_db table found in Druid")
+
+        # Evaluate the per-system totals from the single grouped query
+        counts_status, count_rows = results["counts"]
+        if counts_status != 200:
+            log("ERROR", f"Failed to query QAN record counts: {count_rows}")
+            self.test_results["druid_ingestion"] = False
+            return
+
+        counts = {row['system']: row for row in count_rows}
+
+        mysql_count = counts.get('mysql', {}).get('total', 0)
+        log("INFO", f"Found {mysql_count} MySQL QAN records in Druid")
+        if mysql_count > 0:
+            self.test_results["otel_collection"] = True
+            log("INFO", f"Found {counts['mysql']['test_count']} MySQL test query records in Druid")
+
+        pg_count = counts.get('postgresql', {}).get('total', 0)
+        log("INFO", f"Found {pg_count} PostgreSQL QAN records in Druid")
+        if pg_count > 0:
+            self.test_results["otel_collection"] = True
+            log("INFO", f"Found {counts['postgresql']['test_count']} PostgreSQL test query records in Druid")
+
+        # Mark ingestion as successful if we found any data
+        if mysql_count > 0 or pg_count > 0:
+            log("SUCCESS", "Found QAN data in Druid")
+            self.test_results["druid_ingestion"] = True
+        else:
+            log("ERROR", "No QAN data found in Druid")
+            self.test_results["druid_ingestion"] = False
+
     def _test_jupyter_connection(self):
         """Test connection to JupyterLab"""
         log("INFO", "Testing JupyterLab connection")
         
         try:
-            response = requests.get("http://localhost:8888")
+            response = self._http_probe("http://localhost:8888")
             if response.status_code == 200:
                 log("SUCCESS", "JupyterLab is available")
                 self.test_results["jupyter_connection"] = True
@@ -546,12 +855,24 @@ class ObsidianE2ETest:
         """Print a summary of the test results"""
         log("INFO", "=== END-TO-END TEST SUMMARY ===")
         
-        table_data = []
-        for test, result in self.test_results.items():
-            status = f"{Colors.GREEN}✓ PASSED{Colors.ENDC}" if result else f"{Colors.RED}✗ FAILED{Colors.ENDC}"
-            table_data.append([test.replace("_", " ").title(), status])
-        
-        print(tabulate(table_data, headers=["Test", "Status"], tablefmt="grid"))
+        table_data = [
+            (test.replace("_", " ").title(),
+             f"{Colors.GREEN}✓ PASSED{Colors.ENDC}" if result else f"{Colors.RED}✗ FAILED{Colors.ENDC}")
+            for test, result in self.test_results.items()
+        ]
+
+        # Render the two-column grid by hand and emit it in one write; the
+        # status cells are a fixed 8 characters wide plus invisible color codes
+        width = max(len(name) for name, _ in table_data)
+        separator = f"+{'-' * (width + 2)}+{'-' * 10}+"
+        lines = [
+            separator,
+            f"| {'Test'.ljust(width)} | {'Status'.ljust(8)} |",
+            separator,
+            *[f"| {name.ljust(width)} | {status} |" for name, status in table_data],
+            separator,
+        ]
+        sys.stdout.write("\n".join(lines) + "\n")
         
         # Overall status
         all_passed = all(self.test_results.values())
@@ -597,6 +918,8 @@ def parse_args():
     parser.add_argument("--use-existing", action="store_true", help="Use existing stack (don't start with docker-compose)")
     parser.add_argument("--docker-compose-file", default="../../docker-compose.yml", help="Path to docker-compose.yml")
     parser.add_argument("--skip-wait", action="store_true", help="Skip waiting for data processing")
+    parser.add_argument("--parallel-dbgen", action=argparse.BooleanOptionalAction, default=True,
+                        help="Run MySQL and PostgreSQL data generation concurrently (default: enabled)")
     
     return parser.parse_args()
 